@@ -69,7 +69,9 @@ const SecurityCheckMiddleware = async (
       body
     };
 
-    console.log('Sending request to FastAPI:', JSON.stringify(checkRequest, null, 2));
+    // Serialize once and log only a summary instead of pretty-printing the whole payload
+    const payload = JSON.stringify(checkRequest);
+    console.log('Sending request to FastAPI:', checkRequest.method, checkRequest.path, `${Buffer.byteLength(payload)} bytes`);
 
     const response = await fetch(`${fastApiUrl}/api/v1/security/check`, {
       method: 'POST',
@@ -77,7 +79,7 @@ const SecurityCheckMiddleware = async (
         'Content-Type': 'application/json',
         'X-API-Key': fastApiKey
       },
-      body: JSON.stringify(checkRequest)
+      body: payload
     });
 
     if (!response.ok) {
@@ -0,0 +1,64 @@
+"""
+Anomaly Scoring Benchmark
+
+Measures per-check cost of feature extraction and scoring at batch sizes
+1, 64 and 1024, using a model with random weights (cost does not depend
+on the weight values).
+
+Run from the fastapi directory:
+    python -m benchmarks.anomaly_scoring
+"""
+
+import random
+import timeit
+
+import numpy as np
+
+from src.schemas.security import SecurityCheckRequest
+from src.services.anomaly import FEATURES, AnomalyModel, extract_features
+
+BATCH_SIZES = (1, 64, 1024)
+
+PATHS = ["/api/users/{}", "/api/orders/{}/items", "/static/js/app.{}.js", "/api/search", "/../../etc/passwd{}"]
+HEADERS = {
+    "host": "expressjs_service:3000",
+    "user-agent": "Mozilla/5.0 (X11; Linux x86_64)",
+    "accept": "application/json",
+    "accept-encoding": "gzip, deflate, br",
+    "content-type": "application/json",
+    "cookie": "session=abcdef0123456789",
+}
+
+
+def make_checks(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        SecurityCheckRequest(
+            method="POST",
+            path=rng.choice(PATHS).format(rng.randint(1, 10**6)),
+            headers=dict(rng.sample(sorted(HEADERS.items()), rng.randint(2, len(HEADERS)))),
+            body={f"field{i}": "x" * rng.randint(1, 40) for i in range(rng.randint(0, 8))} or None,
+        )
+        for _ in range(count)
+    ]
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    model = AnomalyModel(weights=rng.normal(size=len(FEATURES)), bias=-2.0, budget_ms=1e6)
+    checks = make_checks(max(BATCH_SIZES))
+
+    print(f"{'batch':>6}{'extract us/check':>18}{'score us/check':>16}{'total us/check':>16}{'batch ms':>10}")
+    for size in BATCH_SIZES:
+        batch = checks[:size]
+        number = max(10, 20000 // size)
+        features = extract_features(batch)
+        extract = timeit.timeit(lambda: extract_features(batch), number=number) / number
+        score = timeit.timeit(lambda: model.score(features), number=number) / number
+        total = timeit.timeit(lambda: model.score_batch(batch), number=number) / number
+        print(f"{size:>6}{extract / size * 1e6:>18.2f}{score / size * 1e6:>16.3f}"
+              f"{total / size * 1e6:>16.2f}{total * 1e3:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
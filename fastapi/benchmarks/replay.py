@@ -0,0 +1,374 @@
+"""
+Traffic Capture and Replay
+
+Builds a replayable corpus from the `request_started` records written by
+LoggingMiddleware and replays it against the ASGI app in-process or against
+a running server over HTTP, reporting latency distributions. Results of two
+runs (e.g. two builds) can be diffed verdict by verdict.
+
+Run from the fastapi directory:
+    python -m benchmarks.replay capture logs/app.log -o corpus.jsonl
+    python -m benchmarks.replay run corpus.jsonl --target src.main:app --rate max -o a.jsonl
+    python -m benchmarks.replay run corpus.jsonl --target http://localhost:8000 --rate 10 -H "X-API-Key: <key>" -o b.jsonl
+    python -m benchmarks.replay diff a.jsonl b.jsonl
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+import msgpack
+
+from src.core.negotiation import MSGPACK_MEDIA_TYPE
+
+# Headers recomputed by the HTTP client on replay
+HOP_HEADERS = {"host", "content-length", "transfer-encoding", "connection"}
+REDACTED = "[REDACTED]"
+# Placeholders LoggingMiddleware logs instead of a real body
+BODY_PLACEHOLDERS = {"Body too large to log", "Could not parse JSON body", "Non-JSON body"}
+
+
+@dataclass
+class CapturedRequest:
+    """A single request in the replay corpus."""
+    offset: float
+    method: str
+    path: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    query_params: Dict[str, str] = field(default_factory=dict)
+    body: Optional[Any] = None
+
+
+@dataclass
+class ReplayResult:
+    """Outcome of replaying one request."""
+    index: int
+    method: str
+    path: str
+    status_code: Optional[int]
+    latency_ms: float
+    verdict: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    queue_ms: float = 0.0
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """Parse the asctime written by the JSON log formatter."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S,%f").timestamp()
+    except ValueError:
+        return None
+
+
+def _replayable_body(body: Any) -> Optional[Any]:
+    """Drop the placeholders logged in place of non-JSON or oversized bodies."""
+    if isinstance(body, dict) and set(body) == {"message"} and body["message"] in BODY_PLACEHOLDERS:
+        return None
+    return body
+
+
+def load_log_records(paths: Iterable[str]) -> List[CapturedRequest]:
+    """
+    Build a corpus from `request_started` log lines.
+
+    Lines that are not JSON (e.g. console output) or other record types are skipped.
+    Offsets are seconds since the first captured request.
+    """
+    records = []
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and record.get("type") == "request_started":
+                    records.append((_parse_timestamp(record.get("asctime")), record))
+
+    timestamps = [timestamp for timestamp, _ in records if timestamp is not None]
+    first = min(timestamps) if timestamps else 0.0
+    corpus = [
+        CapturedRequest(
+            offset=timestamp - first if timestamp is not None else 0.0,
+            method=record["method"],
+            path=record["path"],
+            headers=record.get("headers") or {},
+            query_params=record.get("query_params") or {},
+            body=_replayable_body(record.get("body")),
+        )
+        for timestamp, record in records
+    ]
+    corpus.sort(key=lambda captured: captured.offset)
+    return corpus
+
+
+def save_corpus(corpus: List[CapturedRequest], path: str) -> None:
+    """Write a corpus as a dedicated capture file (one JSON request per line)."""
+    with open(path, "w") as f:
+        for captured in corpus:
+            f.write(json.dumps(asdict(captured)) + "\n")
+
+
+def load_corpus(path: str) -> List[CapturedRequest]:
+    """Read a capture file written by save_corpus."""
+    with open(path) as f:
+        return [CapturedRequest(**json.loads(line)) for line in f if line.strip()]
+
+
+def _load_app(target: str):
+    """Import an ASGI app from a 'module:attribute' string."""
+    module_name, _, attribute = target.partition(":")
+    return getattr(importlib.import_module(module_name), attribute or "app")
+
+
+@asynccontextmanager
+async def open_client(target: str, timeout: float = 30.0) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Open a client for an HTTP base URL or an in-process 'module:attribute' ASGI app.
+
+    In-process apps are run inside their lifespan, so startup handlers
+    (e.g. loading the anomaly model) run exactly as they do under a server.
+    """
+    if target.startswith(("http://", "https://")):
+        async with httpx.AsyncClient(base_url=target, timeout=timeout) as client:
+            yield client
+        return
+    app = _load_app(target)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://replay", timeout=timeout) as client:
+            yield client
+
+
+def _item_verdict(data: Any) -> Optional[Dict[str, Any]]:
+    """Extract one verdict from a decoded security check result."""
+    if isinstance(data, dict) and "is_threat" in data:
+        return {"is_threat": data["is_threat"], "threat_level": data.get("threat_level")}
+    return None
+
+
+def _verdict(response: httpx.Response) -> Optional[Dict[str, Any]]:
+    """
+    Extract the security verdict from a JSON or MessagePack response, if it carries one.
+
+    Batch responses yield {"results": [...]} with one verdict per check.
+    """
+    try:
+        if response.headers.get("content-type", "").startswith(MSGPACK_MEDIA_TYPE):
+            data = msgpack.unpackb(response.content, raw=False)
+        else:
+            data = response.json()
+    except (ValueError, msgpack.UnpackException):
+        return None
+    if isinstance(data, dict) and isinstance(data.get("results"), list):
+        return {"results": [_item_verdict(item) for item in data["results"]]}
+    return _item_verdict(data)
+
+
+async def replay(
+    corpus: List[CapturedRequest],
+    client: httpx.AsyncClient,
+    speed: Optional[float] = 1.0,
+    concurrency: int = 10,
+    header_overrides: Optional[Dict[str, str]] = None,
+) -> List[ReplayResult]:
+    """
+    Replay a corpus.
+
+    With a speed, requests are sent open-loop on the original schedule and
+    latency is measured from each request's scheduled send time, so time
+    spent waiting for a concurrency slot counts against the target; the wait
+    itself is also reported as queue_ms. With speed None the replay is
+    closed-loop and latency is measured from when a slot is acquired.
+
+    Args:
+        corpus: Requests to send
+        client: Client bound to the target
+        speed: Rate multiplier over the original timing (1.0 = original),
+            or None to send as fast as concurrency allows
+        concurrency: Maximum number of requests in flight
+        header_overrides: Headers added to every request, e.g. a real X-API-Key
+
+    Returns:
+        One result per request, in corpus order
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    header_overrides = {k.lower(): v for k, v in (header_overrides or {}).items()}
+    start = time.perf_counter()
+
+    async def send(index: int, captured: CapturedRequest) -> ReplayResult:
+        scheduled = None
+        if speed is not None:
+            scheduled = start + captured.offset / speed
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        headers = {
+            k: v for k, v in captured.headers.items()
+            if k.lower() not in HOP_HEADERS and v != REDACTED
+        }
+        headers.update(header_overrides)
+        async with semaphore:
+            sent = time.perf_counter()
+            origin = scheduled if scheduled is not None else sent
+            queue = (sent - origin) * 1e3
+            try:
+                response = await client.request(
+                    captured.method,
+                    captured.path,
+                    params=captured.query_params,
+                    headers=headers,
+                    content=json.dumps(captured.body).encode() if captured.body is not None else None,
+                )
+            except httpx.HTTPError as e:
+                return ReplayResult(index, captured.method, captured.path, None,
+                                    (time.perf_counter() - origin) * 1e3, error=f"{type(e).__name__}: {e}",
+                                    queue_ms=queue)
+            latency = (time.perf_counter() - origin) * 1e3
+        return ReplayResult(index, captured.method, captured.path, response.status_code, latency,
+                            _verdict(response), queue_ms=queue)
+
+    return list(await asyncio.gather(*(send(i, captured) for i, captured in enumerate(corpus))))
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return 0.0
+    rank = max(int(round(percentile / 100 * len(values))) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def _distribution(values: List[float]) -> dict:
+    """Min, percentiles and max of a list of milliseconds."""
+    values = sorted(values)
+    return {
+        "min": values[0] if values else 0.0,
+        "p50": _percentile(values, 50),
+        "p90": _percentile(values, 90),
+        "p99": _percentile(values, 99),
+        "max": values[-1] if values else 0.0,
+    }
+
+
+def summarize(results: List[ReplayResult], elapsed: float) -> dict:
+    """Latency and queue wait distributions and status breakdown of a replay."""
+    completed = [result for result in results if result.error is None]
+    statuses: Dict[str, int] = {}
+    for result in results:
+        key = str(result.status_code) if result.error is None else "error"
+        statuses[key] = statuses.get(key, 0) + 1
+    return {
+        "requests": len(results),
+        "elapsed_s": elapsed,
+        "throughput_rps": len(results) / elapsed if elapsed else 0.0,
+        "statuses": statuses,
+        "latency_ms": _distribution([result.latency_ms for result in completed]),
+        "queue_ms": _distribution([result.queue_ms for result in completed]),
+    }
+
+
+def diff_results(baseline: List[ReplayResult], candidate: List[ReplayResult]) -> dict:
+    """Compare status codes and verdicts of two replays of the same corpus."""
+    if len(baseline) != len(candidate):
+        raise ValueError(f"Result sets differ in size: {len(baseline)} != {len(candidate)}")
+    differences = [
+        {
+            "index": a.index,
+            "method": a.method,
+            "path": a.path,
+            "baseline": {"status_code": a.status_code, "verdict": a.verdict},
+            "candidate": {"status_code": b.status_code, "verdict": b.verdict},
+        }
+        for a, b in zip(baseline, candidate)
+        if (a.status_code, a.verdict) != (b.status_code, b.verdict)
+    ]
+    return {"compared": len(baseline), "differences": len(differences), "details": differences}
+
+
+def _read_results(path: str) -> List[ReplayResult]:
+    with open(path) as f:
+        return [ReplayResult(**json.loads(line)) for line in f if line.strip()]
+
+
+def _parse_rate(value: str) -> Optional[float]:
+    """'original' -> 1.0, 'max' -> None, otherwise a speed multiplier greater than 0."""
+    if value == "original":
+        return 1.0
+    if value == "max":
+        return None
+    try:
+        speed = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid rate {value!r}: expected 'original', 'max' or a number")
+    if not speed > 0:
+        raise argparse.ArgumentTypeError(f"invalid rate {value!r}: must be greater than 0")
+    return speed
+
+
+def _parse_header(value: str) -> Tuple[str, str]:
+    """Parse a 'Name: value' header, stripping whitespace around both parts."""
+    name, separator, header_value = value.partition(":")
+    if not separator or not name.strip():
+        raise argparse.ArgumentTypeError(f"invalid header {value!r}: expected 'Name: value'")
+    return name.strip(), header_value.strip()
+
+
+async def _run(args: argparse.Namespace) -> None:
+    corpus = load_corpus(args.corpus)
+    async with open_client(args.target) as client:
+        start = time.perf_counter()
+        results = await replay(corpus, client, args.rate, args.concurrency, dict(args.header))
+        elapsed = time.perf_counter() - start
+    if args.output:
+        with open(args.output, "w") as f:
+            for result in results:
+                f.write(json.dumps(asdict(result)) + "\n")
+    print(json.dumps(summarize(results, elapsed), indent=2))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    capture = commands.add_parser("capture", help="Build a corpus from request_started log lines")
+    capture.add_argument("logs", nargs="+", help="JSON log files written by LoggingMiddleware")
+    capture.add_argument("-o", "--output", required=True, help="Capture file to write")
+    capture.add_argument("--path-prefix", default="", help="Only keep requests whose path starts with this")
+
+    run = commands.add_parser("run", help="Replay a corpus and report latencies")
+    run.add_argument("corpus", help="Capture file written by the capture command")
+    run.add_argument("--target", required=True, help="Base URL or in-process ASGI app as 'module:attribute'")
+    run.add_argument("--rate", type=_parse_rate, default="original",
+                     help="'original', 'max', or a speed multiplier greater than 0 such as 2.5")
+    run.add_argument("--concurrency", type=int, default=10, help="Maximum requests in flight")
+    run.add_argument("-H", "--header", type=_parse_header, action="append", default=[],
+                     help="Extra header 'Name: value', repeatable")
+    run.add_argument("-o", "--output", help="Write per-request results here for later diffing")
+
+    diff = commands.add_parser("diff", help="Compare verdicts of two result files")
+    diff.add_argument("baseline")
+    diff.add_argument("candidate")
+
+    args = parser.parse_args(argv)
+    if args.command == "capture":
+        corpus = [c for c in load_log_records(args.logs) if c.path.startswith(args.path_prefix)]
+        save_corpus(corpus, args.output)
+        print(f"Captured {len(corpus)} requests to {args.output}")
+    elif args.command == "run":
+        asyncio.run(_run(args))
+    else:
+        print(json.dumps(diff_results(_read_results(args.baseline), _read_results(args.candidate)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
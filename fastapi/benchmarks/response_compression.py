@@ -0,0 +1,91 @@
+"""
+Response Compression Benchmark
+
+Measures bandwidth and CPU per response for gzip and brotli on typical
+payloads (batch security verdicts, the OpenAPI schema, a metrics dump),
+and the cost of serving the OpenAPI schema rendered and compressed per
+hit versus from the precomputed cache.
+
+Run from the fastapi directory with the app's environment (EXPRESS_API_KEY):
+    python -m benchmarks.response_compression
+"""
+
+import asyncio
+import json
+import time
+import timeit
+
+import httpx
+from fastapi import FastAPI
+
+from src.api.v1.health.router import router as health_router
+from src.api.v1.security.router import router as security_router
+from src.middleware.cache import STATIC_LEVELS, StaticResponseCacheMiddleware
+from src.middleware.compression import CompressionMiddleware, compress
+from benchmarks.anomaly_scoring import make_checks
+from src.services.rules import RuleSet, RuleStats
+from src.services.security import SecurityService
+
+SETTINGS = (("gzip", 6), ("gzip", 9), ("br", 4), ("br", 11))
+
+
+def make_app(cached: bool) -> FastAPI:
+    app = FastAPI()
+    app.include_router(security_router, prefix="/api/v1")
+    app.include_router(health_router, prefix="/api/v1")
+    if cached:
+        app.add_middleware(StaticResponseCacheMiddleware, paths=[app.openapi_url])
+    app.add_middleware(CompressionMiddleware)
+    return app
+
+
+def payloads() -> dict:
+    # Real verdicts for varied checks, so the batch payload is not one object repeated
+    verdicts = asyncio.run(SecurityService().analyze_batch(None, make_checks(1024)))
+    rule_set = RuleSet("live", [])
+    rule_set.stats.update({f"rule_{i}": RuleStats(calls=10**6, hits=i * 37, total_ns=i * 10**9) for i in range(40)})
+    return {
+        "batch verdicts (1024)": json.dumps({"results": verdicts}).encode(),
+        "openapi schema": json.dumps(make_app(cached=False).openapi()).encode(),
+        "metrics dump": json.dumps(rule_set.report()).encode(),
+    }
+
+
+def main(number: int = 200) -> None:
+    print(f"{'payload':<24}{'encoding':<10}{'bytes':>10}{'ratio':>8}{'compress us':>14}")
+    for name, body in payloads().items():
+        print(f"{name:<24}{'identity':<10}{len(body):>10}{1.0:>8.2f}{0.0:>14.1f}")
+        for encoding, level in SETTINGS:
+            compressed = compress(body, encoding, level)
+            # Maximum levels are only used once per static body; a few runs are enough
+            runs = 3 if level >= 10 else number
+            cost = timeit.timeit(lambda: compress(body, encoding, level), number=runs) / runs
+            label = f"{encoding}-{level}"
+            print(f"{'':<24}{label:<10}{len(compressed):>10}{len(body) / len(compressed):>8.2f}{cost * 1e6:>14.1f}")
+
+    print()
+    print(f"openapi.json per hit (static cache levels: {STATIC_LEVELS})")
+    asyncio.run(serve_openapi(number))
+
+
+async def serve_openapi(number: int) -> None:
+    async def per_hit(client: httpx.AsyncClient, headers: dict) -> float:
+        await client.get("/openapi.json", headers=headers)
+        start = time.perf_counter()
+        for _ in range(number):
+            await client.get("/openapi.json", headers=headers)
+        return (time.perf_counter() - start) / number
+
+    for cached in (False, True):
+        transport = httpx.ASGITransport(app=make_app(cached))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for encoding in ("identity", "br"):
+                cost = await per_hit(client, {"Accept-Encoding": encoding})
+                print(f"  {'cached' if cached else 'rendered':<10}{encoding:<10}{cost * 1e6:>10.1f} us")
+            if cached:
+                etag = (await client.get("/openapi.json", headers={"Accept-Encoding": "br"})).headers["etag"]
+                cost = await per_hit(client, {"Accept-Encoding": "br", "If-None-Match": etag})
+                print(f"  {'cached':<10}{'304':<10}{cost * 1e6:>10.1f} us")
+
+if __name__ == "__main__":
+    main()
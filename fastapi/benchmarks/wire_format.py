@@ -0,0 +1,79 @@
+"""
+Wire Format Benchmark
+
+Compares bytes on the wire and decode time per security check for the
+JSON and MessagePack encodings, with the full and the field-trimmed schema.
+
+Run from the fastapi directory:
+    python -m benchmarks.wire_format
+"""
+
+import hashlib
+import json
+import timeit
+
+import msgpack
+
+from src.schemas.security import SecurityCheckRequest, compact_json
+from src.services.security import DANGEROUS_HEADERS
+
+# Headers the security rules actually look at
+ANALYZED_HEADERS = set(DANGEROUS_HEADERS)
+
+FULL_CHECK = {
+    "method": "POST",
+    "path": "/api/users/42/orders",
+    "headers": {
+        "host": "expressjs_service:3000",
+        "connection": "keep-alive",
+        "content-type": "application/json",
+        "content-length": "412",
+        "user-agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+        "accept": "application/json, text/plain, */*",
+        "accept-encoding": "gzip, deflate, br",
+        "accept-language": "en-US,en;q=0.9",
+        "cookie": "session=abcdef0123456789; csrf=0123456789abcdef",
+        "x-forwarded-for": "203.0.113.7",
+        "x-csrf-token": "0123456789abcdef0123456789abcdef",
+    },
+    "body": {
+        "items": [{"sku": f"SKU-{i:04d}", "quantity": i % 5 + 1, "note": "gift wrap"} for i in range(8)],
+        "shipping": {"street": "1 Main St", "city": "Springfield", "zip": "12345"},
+        "coupon": None,
+    },
+}
+
+
+def trim(check: dict) -> dict:
+    """Keep only analyzed headers and replace the body with its size and digest."""
+    body = compact_json(check["body"])
+    return {
+        "method": check["method"],
+        "path": check["path"],
+        "headers": {k: v for k, v in check["headers"].items() if k in ANALYZED_HEADERS},
+        "body_size": len(body),
+        "body_digest": hashlib.sha256(body).hexdigest(),
+    }
+
+
+def main(number: int = 20000) -> None:
+    trimmed = trim(FULL_CHECK)
+    variants = {
+        "json (pretty)": (json.dumps(FULL_CHECK, indent=2).encode(), json.loads),
+        "json": (json.dumps(FULL_CHECK, separators=(",", ":")).encode(), json.loads),
+        "msgpack": (msgpack.packb(FULL_CHECK), msgpack.unpackb),
+        "json trimmed": (json.dumps(trimmed, separators=(",", ":")).encode(), json.loads),
+        "msgpack trimmed": (msgpack.packb(trimmed), msgpack.unpackb),
+    }
+
+    print(f"{'encoding':<18}{'bytes':>8}{'decode us':>12}{'decode+validate us':>22}")
+    for name, (payload, loads) in variants.items():
+        decode = timeit.timeit(lambda: loads(payload), number=number) / number
+        validate = timeit.timeit(
+            lambda: SecurityCheckRequest.model_validate(loads(payload)), number=number
+        ) / number
+        print(f"{name:<18}{len(payload):>8}{decode * 1e6:>12.2f}{validate * 1e6:>22.2f}")
+
+
+if __name__ == "__main__":
+    main()
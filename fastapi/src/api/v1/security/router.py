@@ -4,11 +4,22 @@ Security Router
 This module handles the routing for security-related endpoints.
 """
 
-from fastapi import APIRouter, Depends, Request
-from fastapi.responses import JSONResponse
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from src.core.dependencies import verify_express_origin
-from src.schemas.security import SecurityCheckRequest, SecurityCheckResponse
-from src.services.security import SecurityService
+from src.core.logger import logger
+from src.core.negotiation import body_model, body_model_openapi, negotiate_response
+from src.schemas.security import (
+    SecurityBatchCheckRequest,
+    SecurityBatchCheckResponse,
+    SecurityCheckRequest,
+    SecurityCheckResponse,
+    ShadowRulesRequest,
+)
+from src.services.anomaly import get_anomaly_model
+from src.services.rules import build_rule_set
+from src.services.security import RULES, SecurityService, get_rule_engine
 
 router = APIRouter(
     prefix="/security",
@@ -19,11 +30,97 @@ router = APIRouter(
 
 """endpoint /security/check"""
 
-@router.post("/check", response_model=SecurityCheckResponse)
-async def check_security(request: Request, check_request: SecurityCheckRequest):
+@router.post(
+    "/check",
+    response_model=SecurityCheckResponse,
+    openapi_extra=body_model_openapi(SecurityCheckRequest)
+)
+async def check_security(
+    request: Request,
+    check_request: SecurityCheckRequest = Depends(body_model(SecurityCheckRequest))
+):
     """
     Check incoming request for security threats
+
+    Accepts and returns JSON or MessagePack, chosen via Content-Type and Accept
     """
     security_service = SecurityService()
     result = await security_service.analyze_request(request, check_request)
-    return JSONResponse(content=result)
+    return negotiate_response(request, result)
+
+
+"""endpoint /security/check/batch"""
+
+@router.post(
+    "/check/batch",
+    response_model=SecurityBatchCheckResponse,
+    openapi_extra=body_model_openapi(SecurityBatchCheckRequest)
+)
+async def check_security_batch(
+    request: Request,
+    batch_request: SecurityBatchCheckRequest = Depends(body_model(SecurityBatchCheckRequest))
+):
+    """
+    Check a batch of incoming requests for security threats
+
+    Accepts and returns JSON or MessagePack, chosen via Content-Type and Accept
+    """
+    security_service = SecurityService()
+    results = await security_service.analyze_batch(request, batch_request.checks)
+    return negotiate_response(request, {"results": results})
+
+
+"""endpoint /security/rules/metrics"""
+
+@router.get("/rules/metrics")
+async def rule_metrics():
+    """
+    Report per-rule cost and hit counters for the live and shadow rule sets,
+    and the anomaly analyzer counters when a model is loaded
+    """
+    model = get_anomaly_model()
+    return {
+        **get_rule_engine().report(),
+        "anomaly": model.stats.to_dict() if model is not None else None
+    }
+
+
+"""endpoint /security/rules/promote"""
+
+@router.post("/rules/promote")
+async def promote_shadow_rules():
+    """
+    Promote the shadow rule set to live
+    """
+    engine = get_rule_engine()
+    try:
+        previous = engine.promote()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    promoted = [rule.name for rule in engine.live.rules]
+    logger.warning({
+        "type": "security_rules_promoted",
+        "promoted": promoted,
+        "previous": [rule.name for rule in previous.rules],
+        "message": f"Promotion is in memory only; set SECURITY_RULES={json.dumps(promoted)} to keep it after a restart"
+    })
+    return {
+        "promoted": promoted,
+        "previous": [rule.name for rule in previous.rules]
+    }
+
+
+"""endpoint /security/rules/shadow"""
+
+@router.put("/rules/shadow")
+async def set_shadow_rules(shadow_request: ShadowRulesRequest):
+    """
+    Replace the shadow rule set, or disable shadowing with an empty rule list
+    """
+    try:
+        shadow = build_rule_set("shadow", shadow_request.rules, RULES) if shadow_request.rules else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    engine = get_rule_engine()
+    engine.set_shadow(shadow, shadow_request.sample_rate)
+    return engine.report()["shadow"]
@@ -46,11 +46,39 @@ class SecurityConfig(BaseSettings):
         CORS_ORIGINS (list[str]): Allowed origins for CORS.
         MAX_BODY_SIZE (int): Maximum allowed body size for requests (in KB).
         RATE_LIMIT_PER_MINUTE (int): Maximum number of requests allowed per minute.
+        SECURITY_RULES (list[str]): Names of the rules in the live security rule set.
+        SHADOW_RULES (list[str]): Names of the rules in the shadow rule set (empty disables shadowing).
+        SHADOW_SAMPLE_RATE (float): Fraction of security checks also evaluated by the shadow rule set.
+        ANOMALY_MODEL_PATH (str): Path of the anomaly scoring model file (empty disables scoring).
+        ANOMALY_MAX_BATCH (int): Maximum number of checks scored in one vectorized call; the budget is checked between calls.
+        ANOMALY_BATCH_BUDGET_MS (float): Time budget for scoring one batch; checks beyond it are left unscored.
     """
     CORS_ORIGINS: list[str] = Field(default_factory=lambda: ["http://example.com", "http://anotherdomain.com"], env="CORS_ORIGINS")  # Configurable via environment
     MAX_BODY_SIZE: int = Field(100, env="MAX_BODY_SIZE")
     RATE_LIMIT_PER_MINUTE: int = Field(100, env="RATE_LIMIT_PER_MINUTE")
     SLOW_REQUEST_THRESHOLD: float = Field(1.0, env="SLOW_REQUEST_THRESHOLD")
+    SECURITY_RULES: list[str] = Field(default_factory=lambda: ["body_size", "suspicious_headers", "suspicious_path"], env="SECURITY_RULES")
+    SHADOW_RULES: list[str] = Field(default_factory=list, env="SHADOW_RULES")
+    SHADOW_SAMPLE_RATE: float = Field(0.1, ge=0, le=1, env="SHADOW_SAMPLE_RATE")
+    ANOMALY_MODEL_PATH: str = Field("", env="ANOMALY_MODEL_PATH")
+    ANOMALY_MAX_BATCH: int = Field(256, gt=0, env="ANOMALY_MAX_BATCH")
+    ANOMALY_BATCH_BUDGET_MS: float = Field(50.0, ge=0, env="ANOMALY_BATCH_BUDGET_MS")
+
+class PerformanceConfig(BaseSettings):
+    """
+    Response optimization configuration.
+
+    Attributes:
+        COMPRESSION_MINIMUM_SIZE (int): Responses smaller than this many bytes are not compressed.
+        COMPRESSION_GZIP_LEVEL (int): gzip level used for streamed responses.
+        COMPRESSION_BROTLI_QUALITY (int): Brotli quality used for streamed responses.
+        STATIC_CACHE_ENABLED (bool): Serve health and documentation endpoints from precomputed bodies.
+    """
+    COMPRESSION_MINIMUM_SIZE: int = Field(500, env="COMPRESSION_MINIMUM_SIZE")
+    COMPRESSION_GZIP_LEVEL: int = Field(6, env="COMPRESSION_GZIP_LEVEL")
+    COMPRESSION_BROTLI_QUALITY: int = Field(4, env="COMPRESSION_BROTLI_QUALITY")
+    STATIC_CACHE_ENABLED: bool = Field(True, env="STATIC_CACHE_ENABLED")
+
 class ExternalServicesConfig(BaseSettings):
     """
     Configuration for external services.
@@ -62,7 +90,7 @@ class ExternalServicesConfig(BaseSettings):
     EXPRESS_API_KEY: str = Field(..., env="EXPRESS_API_KEY")  # Sourced from environment variables; required for security
     EXPRESS_SERVER_URL: str = Field("<PLACEHOLDER_URL>", env="EXPRESS_SERVER_URL")  # Use placeholder and ensure environment-specific overrides
 
-class Config(AppConfig, RuntimeConfig, SecurityConfig, ExternalServicesConfig):
+class Config(AppConfig, RuntimeConfig, SecurityConfig, PerformanceConfig, ExternalServicesConfig):
     """
     Consolidated application configuration.
 
@@ -0,0 +1,146 @@
+"""
+Content Negotiation
+
+This module lets endpoints accept and return MessagePack in addition to JSON.
+The encoding is chosen through the Content-Type and Accept headers; JSON
+stays the default when neither asks for MessagePack.
+"""
+
+import json
+from typing import Any, Type, TypeVar
+
+import msgpack
+from fastapi import HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, ValidationError
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack"}
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class MessagePackResponse(Response):
+    """Response rendered as MessagePack."""
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(jsonable_encoder(content), use_bin_type=True)
+
+
+def _media_type(value: str) -> str:
+    """Strip parameters such as charset from a media type."""
+    return value.split(";", 1)[0].strip().lower()
+
+
+def _accept_qualities(accept: str) -> dict:
+    """Map each media range in an Accept header to its q-value."""
+    qualities = {}
+    for part in accept.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            qualities[name.strip()] = max(quality, qualities.get(name.strip(), 0.0))
+    return qualities
+
+
+def _quality(qualities: dict, media_types: set) -> float:
+    """q-value of the most specific range in an Accept header matching any of media_types."""
+    exact = [qualities[media_type] for media_type in media_types if media_type in qualities]
+    if exact:
+        return max(exact)
+    return qualities.get("application/*", qualities.get("*/*", 0.0))
+
+
+def wants_msgpack(request: Request) -> bool:
+    """
+    Whether the client prefers a MessagePack response.
+
+    MessagePack is chosen only when its q-value beats JSON's; JSON wins ties
+    and is used when there is no Accept header.
+    """
+    accept = request.headers.get("accept", "")
+    if not accept:
+        return False
+    qualities = _accept_qualities(accept)
+    msgpack_quality = _quality(qualities, MSGPACK_MEDIA_TYPES)
+    return msgpack_quality > 0 and msgpack_quality > _quality(qualities, {"application/json"})
+
+
+def _reject_ext(code: int, data: bytes) -> Any:
+    """Refuse MessagePack extension types, which have no JSON equivalent."""
+    raise ValueError(f"unsupported MessagePack extension type {code}")
+
+
+async def decode_body(request: Request) -> Any:
+    """
+    Decode the request body according to its Content-Type.
+
+    MessagePack bin values decode to bytes and timestamps to datetimes;
+    other extension types are rejected.
+
+    Raises:
+        HTTPException: If the body cannot be decoded
+    """
+    body = await request.body()
+    try:
+        if _media_type(request.headers.get("content-type", "")) in MSGPACK_MEDIA_TYPES:
+            return msgpack.unpackb(body, raw=False, timestamp=3, ext_hook=_reject_ext)
+        return json.loads(body)
+    except (ValueError, msgpack.UnpackException) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not decode request body: {e}"
+        )
+
+
+def body_model(model: Type[ModelT]):
+    """
+    Build a dependency that parses the request body into a model.
+
+    Args:
+        model: Pydantic model used to validate the decoded body
+
+    Returns:
+        Dependency returning a validated model instance
+    """
+    async def dependency(request: Request) -> ModelT:
+        try:
+            return model.model_validate(await decode_body(request))
+        except ValidationError as e:
+            # Same error locations as FastAPI's own body validation
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors()]
+            )
+
+    return dependency
+
+
+def body_model_openapi(model: Type[BaseModel]) -> dict:
+    """OpenAPI request body for endpoints using body_model."""
+    schema = model.model_json_schema()
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": schema},
+                MSGPACK_MEDIA_TYPE: {"schema": schema},
+            },
+        }
+    }
+
+
+def negotiate_response(request: Request, content: Any, status_code: int = 200) -> Response:
+    """Return content as MessagePack if the client accepts it, otherwise as JSON."""
+    if wants_msgpack(request):
+        return MessagePackResponse(content=content, status_code=status_code)
+    return JSONResponse(content=content, status_code=status_code)
@@ -7,7 +7,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi_limiter.depends import RateLimiter  # Example for rate limiting
 from src.core.config import get_settings
 from src.core.logger import logger
+from src.middleware.cache import StaticResponseCacheMiddleware
+from src.middleware.compression import CompressionMiddleware
 from src.middleware.logging import LoggingMiddleware
+from src.services.anomaly import load_anomaly_model
+from src.services.security import load_rule_engine
 from src.api.v1.security.router import router as security_router
 from src.api.v1.health.router import router as health_router
 from src.api.v1.test.router import router as test_router
@@ -34,6 +38,19 @@ def create_app() -> FastAPI:
         debug=settings.DEBUG if settings.DEBUG else False
     )
 
+    # Serve static endpoints from precomputed, pre-compressed bodies with ETags
+    if settings.STATIC_CACHE_ENABLED:
+        static_paths = [f"{settings.API_V1_PREFIX}/health", app.openapi_url, settings.DOCS_URL, settings.REDOC_URL]
+        app.add_middleware(StaticResponseCacheMiddleware, paths=[path for path in static_paths if path])
+
+    # Compress responses above the size threshold
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
     # Configure CORS
     app.add_middleware(
         CORSMiddleware,
@@ -60,6 +77,10 @@ def create_app() -> FastAPI:
     @app.on_event("startup")
     async def startup_event():
         logger.info("FastAPI application is starting up.", extra={"settings": settings.dict()})
+        # Unknown rule names raise here and stop startup instead of failing every check
+        load_rule_engine(settings.SECURITY_RULES, settings.SHADOW_RULES, settings.SHADOW_SAMPLE_RATE)
+        if load_anomaly_model(settings.ANOMALY_MODEL_PATH, settings.ANOMALY_MAX_BATCH, settings.ANOMALY_BATCH_BUDGET_MS):
+            logger.info("Anomaly scoring model loaded", extra={"path": settings.ANOMALY_MODEL_PATH})
 
     @app.on_event("shutdown")
     async def shutdown_event():
@@ -0,0 +1,87 @@
+"""
+Static response cache middleware for FastAPI.
+"""
+import hashlib
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable
+
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.middleware.compression import SUPPORTED_ENCODINGS, compress, negotiate_encoding
+
+# Compression levels for bodies compressed once and served many times
+STATIC_LEVELS = {"gzip": 9, "br": 11}
+
+
+@dataclass
+class CachedBody:
+    """A precomputed response body with its compressed variants and ETags."""
+    media_type: str
+    bodies: Dict[str, bytes] = field(default_factory=dict)
+    etags: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, body: bytes, media_type: str) -> "CachedBody":
+        """Compress the body with every supported encoding and derive the ETags."""
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        entry = cls(media_type=media_type, bodies={"identity": body}, etags={"identity": f'"{digest}"'})
+        for encoding in SUPPORTED_ENCODINGS:
+            entry.bodies[encoding] = compress(body, encoding, STATIC_LEVELS[encoding])
+            entry.etags[encoding] = f'"{digest}-{encoding}"'
+        return entry
+
+    def matches(self, if_none_match: str, encoding: str) -> bool:
+        """Whether an If-None-Match header matches the ETag of the negotiated variant (weak comparison)."""
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etags[encoding] in tags
+
+    def respond(self, request: Request) -> Response:
+        """Serve the negotiated variant, or 304 if the client already has it. HEAD gets the headers only."""
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", "")) or "identity"
+        headers = {"etag": self.etags[encoding], "vary": "Accept-Encoding", "cache-control": "no-cache"}
+        if self.matches(request.headers.get("if-none-match", ""), encoding):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["content-encoding"] = encoding
+        if request.method == "HEAD":
+            headers["content-length"] = str(len(self.bodies[encoding]))
+            return Response(media_type=self.media_type, headers=headers)
+        return Response(content=self.bodies[encoding], media_type=self.media_type, headers=headers)
+
+
+class StaticResponseCacheMiddleware(BaseHTTPMiddleware):
+    """
+    Serve static or rarely-changing GET endpoints from precomputed bodies.
+
+    The first successful response for each configured path is rendered by
+    the app, compressed once per supported encoding and kept in memory.
+    Later hits are served from that copy, with ETag / If-None-Match support.
+    GET and HEAD behave the same whether or not the cache is primed.
+    """
+
+    def __init__(self, app, paths: Iterable[str]):
+        super().__init__(app)
+        self.paths = set(paths)
+        self._cache: Dict[str, CachedBody] = {}
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        path = request.url.path
+        if request.method not in ("GET", "HEAD") or path not in self.paths:
+            return await call_next(request)
+
+        entry = self._cache.get(path)
+        if entry is None:
+            # Render with GET even for HEAD, so a HEAD primes the cache instead of reaching a GET-only route
+            method = request.scope["method"]
+            request.scope["method"] = "GET"
+            try:
+                response = await call_next(request)
+            finally:
+                request.scope["method"] = method
+            if response.status_code != 200 or "content-encoding" in response.headers:
+                return response
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            entry = CachedBody.build(body, response.headers.get("content-type", "application/octet-stream"))
+            self._cache[path] = entry
+        return entry.respond(request)
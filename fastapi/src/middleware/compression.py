@@ -0,0 +1,110 @@
+"""
+Compression middleware for FastAPI.
+"""
+import zlib
+from typing import Callable, Iterable, Optional
+
+import brotli
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+
+# Encodings in order of preference when the client accepts several
+SUPPORTED_ENCODINGS = ("br", "gzip")
+# Content types that are already compressed
+INCOMPRESSIBLE_PREFIXES = ("image/", "video/", "audio/", "application/zip", "application/gzip", "font/woff")
+
+
+def negotiate_encoding(accept_encoding: str, supported: Iterable[str] = SUPPORTED_ENCODINGS) -> Optional[str]:
+    """
+    Pick the preferred supported encoding from an Accept-Encoding header.
+
+    Encodings with q=0 are refused; ties are broken by the order of `supported`.
+    """
+    qualities = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            qualities[name] = quality
+    candidates = [
+        (qualities.get(encoding, qualities.get("*", 0.0)), -index, encoding)
+        for index, encoding in enumerate(supported)
+    ]
+    quality, _, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+
+def compressor_for(encoding: str, level: int):
+    """
+    Create an incremental compressor.
+
+    Returns:
+        Tuple of (compress(chunk) -> bytes, finish() -> bytes) callables
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=level)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    return compressor.compress, compressor.flush
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    """Compress a complete body in one call."""
+    process, finish = compressor_for(encoding, level)
+    return process(body) + finish()
+
+
+class CompressionMiddleware(BaseHTTPMiddleware):
+    """
+    Compress responses with brotli or gzip, negotiated via Accept-Encoding.
+
+    Bodies are compressed chunk by chunk as they stream through, so the
+    response is never buffered as a whole. Responses that declare a
+    Content-Length below `minimum_size` are sent unchanged.
+    """
+
+    def __init__(self, app, minimum_size: int = 500, gzip_level: int = 6, brotli_quality: int = 4):
+        super().__init__(app)
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "br": brotli_quality}
+
+    def should_compress(self, request: Request, response: Response) -> bool:
+        """Whether a response is worth compressing."""
+        if request.method == "HEAD" or response.status_code in (204, 304):
+            return False
+        if "content-encoding" in response.headers:
+            return False
+        content_type = response.headers.get("content-type", "")
+        if content_type.startswith(INCOMPRESSIBLE_PREFIXES):
+            return False
+        length = response.headers.get("content-length")
+        return length is None or int(length) >= self.minimum_size
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        response = await call_next(request)
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if encoding is None or not self.should_compress(request, response):
+            return response
+
+        process, finish = compressor_for(encoding, self.levels[encoding])
+        body_iterator = response.body_iterator
+
+        async def compressed_body():
+            async for chunk in body_iterator:
+                data = process(chunk)
+                if data:
+                    yield data
+            yield finish()
+
+        response.body_iterator = compressed_body()
+        del response.headers["content-length"]
+        response.headers["content-encoding"] = encoding
+        response.headers.append("vary", "Accept-Encoding")
+        return response
@@ -4,15 +4,44 @@ Security Schemas
 This module defines the Pydantic models for security-related requests and responses.
 """
 
-from typing import Dict, Any, Optional
+import base64
+import json
+from datetime import datetime
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 
+def _json_default(value: Any) -> Any:
+    """Encode the non-JSON values MessagePack bodies may carry as a JSON client would send them."""
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def compact_json(body: Any) -> bytes:
+    """Serialize a body as compact UTF-8 JSON, the encoding body_size is measured in."""
+    return json.dumps(body, separators=(",", ":"), ensure_ascii=False, default=_json_default).encode("utf-8")
+
 class SecurityCheckRequest(BaseModel):
     """Request model for security checks."""
     body: Optional[Dict[str, Any]] = Field(None, description="Request body to analyze")
+    body_size: Optional[int] = Field(None, description="Length in bytes of the body as compact UTF-8 JSON (no whitespace between tokens, binary values base64-encoded), sent instead of the body by trimmed clients")
+    body_digest: Optional[str] = Field(None, description="Digest of the body, sent instead of the body by trimmed clients")
     headers: Dict[str, str] = Field(..., description="Request headers to analyze")
     path: str = Field(..., description="Request path to analyze")
     method: str = Field(..., description="HTTP method used")
+
+    def measured_body_size(self) -> int:
+        """
+        Size of the body in bytes.
+
+        The body is measured as compact UTF-8 JSON so full and trimmed
+        payloads of the same request get the same size. Binary values from
+        MessagePack bodies count as their base64 text.
+        """
+        if self.body:
+            return len(compact_json(self.body))
+        return self.body_size or 0
     
 class SecurityCheckResponse(BaseModel):
     """Response model for security check results."""
@@ -20,3 +49,21 @@ class SecurityCheckResponse(BaseModel):
     threat_level: str = Field(..., description="Low, Medium, or High")
     details: Dict[str, Any] = Field(..., description="Detailed analysis results")
     recommendations: Optional[Dict[str, str]] = Field(None, description="Security recommendations")
+    anomaly_scored: Optional[bool] = Field(None, description="Whether the anomaly model scored this request; absent when no model is loaded")
+
+
+# Largest batch accepted by the batch endpoint; the anomaly model scores it in ANOMALY_MAX_BATCH chunks
+MAX_BATCH_CHECKS = 1024
+
+class SecurityBatchCheckRequest(BaseModel):
+    """Request model for batched security checks."""
+    checks: List[SecurityCheckRequest] = Field(..., max_length=MAX_BATCH_CHECKS, description="Requests to analyze")
+
+class SecurityBatchCheckResponse(BaseModel):
+    """Response model for batched security check results."""
+    results: List[SecurityCheckResponse] = Field(..., description="Analysis results, in request order")
+
+class ShadowRulesRequest(BaseModel):
+    """Request model for replacing the shadow rule set."""
+    rules: List[str] = Field(..., description="Names of the rules in the shadow rule set; empty disables shadowing")
+    sample_rate: float = Field(0.1, ge=0.0, le=1.0, description="Fraction of security checks also evaluated by the shadow rule set")
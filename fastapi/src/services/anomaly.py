@@ -0,0 +1,237 @@
+"""
+Anomaly Scoring
+
+This module contains the optional ML analyzer that scores security checks
+with a linear model. Features are extracted and scored with NumPy over
+whole batches of checks.
+"""
+
+import json
+import math
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.schemas.security import SecurityCheckRequest
+
+# Header names whose presence is used as a feature
+KNOWN_HEADERS = (
+    "user-agent",
+    "accept",
+    "accept-language",
+    "accept-encoding",
+    "content-type",
+    "cookie",
+    "referer",
+    "x-forwarded-for",
+)
+
+FEATURES = (
+    "path_length",
+    "path_depth",
+    "path_entropy",
+    "header_count",
+    *(f"has_{name}" for name in KNOWN_HEADERS),
+    "body_size",
+    "body_key_count",
+)
+
+# Paths are truncated to this many bytes to bound extraction cost
+MAX_PATH_BYTES = 2048
+
+# Character classes: 0 lower, 1 upper, 2 digit, 3 separator ("/-_."), 4 other
+_CHAR_CLASSES = 5
+_CLASS_TABLE = np.full(256, 4, dtype=np.int64)
+_CLASS_TABLE[np.frombuffer(b"abcdefghijklmnopqrstuvwxyz", dtype=np.uint8)] = 0
+_CLASS_TABLE[np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", dtype=np.uint8)] = 1
+_CLASS_TABLE[np.frombuffer(b"0123456789", dtype=np.uint8)] = 2
+_CLASS_TABLE[np.frombuffer(b"/-_.", dtype=np.uint8)] = 3
+_SLASH = ord("/")
+
+
+def extract_features(checks: Sequence[SecurityCheckRequest]) -> np.ndarray:
+    """
+    Extract the feature matrix for a batch of checks.
+
+    Args:
+        checks: Security check requests
+
+    Returns:
+        Array of shape (len(checks), len(FEATURES))
+    """
+    n = len(checks)
+    paths = [check.path.encode("utf-8", "replace")[:MAX_PATH_BYTES] for check in checks]
+    lengths = np.fromiter((len(path) for path in paths), dtype=np.int64, count=n)
+    buffer = np.frombuffer(b"".join(paths), dtype=np.uint8)
+    rows = np.repeat(np.arange(n), lengths)
+
+    # Character-class histogram per path, then Shannon entropy over the classes
+    counts = np.bincount(
+        rows * _CHAR_CLASSES + _CLASS_TABLE[buffer], minlength=n * _CHAR_CLASSES
+    ).reshape(n, _CHAR_CLASSES)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = counts / np.maximum(lengths, 1)[:, None]
+        entropy = -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=1)
+    depth = np.bincount(rows[buffer == _SLASH], minlength=n)
+
+    headers = [{name.lower() for name in check.headers} for check in checks]
+    known = np.array([[name in names for name in KNOWN_HEADERS] for names in headers], dtype=np.float64)
+
+    body_size = np.fromiter(
+        (check.measured_body_size() for check in checks),
+        dtype=np.float64, count=n,
+    )
+    key_count = np.fromiter((len(check.body) if check.body else 0 for check in checks), dtype=np.float64, count=n)
+
+    return np.column_stack([
+        lengths,
+        depth,
+        entropy,
+        [len(names) for names in headers],
+        known.reshape(n, len(KNOWN_HEADERS)),
+        body_size,
+        key_count,
+    ]).astype(np.float64)
+
+
+@dataclass
+class ScoringStats:
+    """Counters for the anomaly analyzer."""
+    batches: int = 0
+    checks: int = 0
+    skipped: int = 0
+    total_ns: int = 0
+    max_batch_ns: int = 0
+
+    def to_dict(self) -> dict:
+        """Return the counters in a JSON-serializable form."""
+        return {
+            "batches": self.batches,
+            "checks": self.checks,
+            "skipped": self.skipped,
+            "total_ms": self.total_ns / 1e6,
+            "avg_us_per_check": self.total_ns / self.checks / 1e3 if self.checks else 0.0,
+            "max_batch_ms": self.max_batch_ns / 1e6,
+        }
+
+
+class AnomalyModel:
+    """
+    Logistic-regression scorer over standardized features.
+
+    The model file is JSON with `weights`, `bias`, `threshold` and optional
+    `mean`/`scale` lists, each feature-aligned with FEATURES.
+    """
+
+    def __init__(
+        self,
+        weights: Sequence[float],
+        bias: float,
+        threshold: float = 0.5,
+        mean: Optional[Sequence[float]] = None,
+        scale: Optional[Sequence[float]] = None,
+        max_batch: int = 256,
+        budget_ms: float = 50.0,
+    ):
+        if max_batch < 1:
+            raise ValueError(f"Anomaly max_batch must be at least 1, got {max_batch}")
+        if budget_ms < 0:
+            raise ValueError(f"Anomaly budget_ms must not be negative, got {budget_ms}")
+        size = len(FEATURES)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.mean = np.asarray(mean if mean is not None else np.zeros(size), dtype=np.float64)
+        self.scale = np.asarray(scale if scale is not None else np.ones(size), dtype=np.float64)
+        for name, array in (("weights", self.weights), ("mean", self.mean), ("scale", self.scale)):
+            if array.shape != (size,):
+                raise ValueError(f"Anomaly model {name} must have {size} entries, got {array.shape[0]}")
+        self.scale[self.scale == 0] = 1.0
+        self.bias = float(bias)
+        self.threshold = float(threshold)
+        self.max_batch = max_batch
+        self.budget_ns = int(budget_ms * 1e6)
+        self.stats = ScoringStats()
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "AnomalyModel":
+        """Load a model from a JSON file."""
+        with open(path) as f:
+            data = json.load(f)
+        features = data.get("features")
+        if features is not None and tuple(features) != FEATURES:
+            raise ValueError(f"Anomaly model features do not match: expected {list(FEATURES)}")
+        return cls(
+            weights=data["weights"],
+            bias=data["bias"],
+            threshold=data.get("threshold", 0.5),
+            mean=data.get("mean"),
+            scale=data.get("scale"),
+            **kwargs,
+        )
+
+    def score(self, features: np.ndarray) -> np.ndarray:
+        """Score a feature matrix, returning probabilities in [0, 1]."""
+        z = ((features - self.mean) / self.scale) @ self.weights + self.bias
+        return 1.0 / (1.0 + np.exp(-np.clip(z, -500, 500)))
+
+    def score_batch(self, checks: Sequence[SecurityCheckRequest]) -> np.ndarray:
+        """
+        Score a batch of checks within the latency budget.
+
+        Checks are scored in chunks of at most max_batch. The first chunk is
+        always scored; once the budget is spent, remaining chunks are left
+        unscored (NaN) rather than delaying the verdict.
+        """
+        scores = np.full(len(checks), math.nan)
+        start = time.perf_counter_ns()
+        for offset in range(0, len(checks), self.max_batch):
+            if offset and time.perf_counter_ns() - start > self.budget_ns:
+                self.stats.skipped += len(checks) - offset
+                break
+            chunk = checks[offset:offset + self.max_batch]
+            scores[offset:offset + len(chunk)] = self.score(extract_features(chunk))
+            self.stats.checks += len(chunk)
+        elapsed = time.perf_counter_ns() - start
+        self.stats.batches += 1
+        self.stats.total_ns += elapsed
+        self.stats.max_batch_ns = max(self.stats.max_batch_ns, elapsed)
+        return scores
+
+    def verdicts(self, checks: Sequence[SecurityCheckRequest]) -> List[Tuple[bool, Optional[dict]]]:
+        """
+        Score checks and return the detail for each check above the threshold.
+
+        Returns:
+            One (scored, detail) pair per check. scored is False for checks
+            skipped because the budget ran out; detail is a dict if the
+            check was flagged, otherwise None
+        """
+        return [
+            (
+                not math.isnan(score),
+                {"score": round(float(score), 4), "threshold": self.threshold}
+                if score >= self.threshold else None,
+            )
+            for score in self.score_batch(checks)
+        ]
+
+
+_anomaly_model: Optional[AnomalyModel] = None
+
+
+def load_anomaly_model(path: Optional[str], max_batch: int = 256, budget_ms: float = 50.0) -> Optional[AnomalyModel]:
+    """
+    Load the process-wide anomaly model, or disable scoring if no path is set.
+
+    Returns:
+        The loaded model, or None when scoring is disabled
+    """
+    global _anomaly_model
+    _anomaly_model = AnomalyModel.load(path, max_batch=max_batch, budget_ms=budget_ms) if path else None
+    return _anomaly_model
+
+
+def get_anomaly_model() -> Optional[AnomalyModel]:
+    """Get the process-wide anomaly model, or None when scoring is disabled."""
+    return _anomaly_model
@@ -0,0 +1,215 @@
+"""
+Security Rule Engine
+
+This module contains the rule abstraction used by the security service,
+per-rule cost accounting and shadow evaluation of candidate rule sets.
+"""
+
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Ordering used to combine the levels reported by individual rules
+THREAT_LEVELS = ("Low", "Medium", "High")
+
+# A rule check returns (detail, threat_level) when it fires, otherwise None
+RuleCheck = Callable[[Any, Any], Optional[Tuple[Any, str]]]
+
+
+@dataclass
+class Rule:
+    """A single named security check."""
+    name: str
+    check: RuleCheck
+
+
+@dataclass
+class RuleStats:
+    """Low-overhead counters for a single rule."""
+    calls: int = 0
+    hits: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+
+    def record(self, elapsed_ns: int, hit: bool) -> None:
+        """Record one evaluation of the rule."""
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        if hit:
+            self.hits += 1
+
+    def to_dict(self) -> dict:
+        """Return the counters in a JSON-serializable form."""
+        return {
+            "calls": self.calls,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.calls if self.calls else 0.0,
+            "total_ms": self.total_ns / 1e6,
+            "avg_us": self.total_ns / self.calls / 1e3 if self.calls else 0.0,
+            "max_us": self.max_ns / 1e3,
+        }
+
+
+@dataclass
+class RuleSet:
+    """An ordered collection of rules evaluated together."""
+    name: str
+    rules: List[Rule]
+    stats: Dict[str, RuleStats] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for rule in self.rules:
+            self.stats.setdefault(rule.name, RuleStats())
+
+    def evaluate(self, check_request: Any, settings: Any) -> Tuple[dict, str, int]:
+        """
+        Run every rule against a check request.
+
+        Args:
+            check_request: The security check request data
+            settings: Application settings
+
+        Returns:
+            Tuple of (threat details, threat level, elapsed nanoseconds)
+        """
+        details = {}
+        level = 0
+        total_ns = 0
+        for rule in self.rules:
+            start = time.perf_counter_ns()
+            result = rule.check(check_request, settings)
+            elapsed = time.perf_counter_ns() - start
+            total_ns += elapsed
+            self.stats[rule.name].record(elapsed, result is not None)
+            if result is not None:
+                detail, rule_level = result
+                details[rule.name] = detail
+                level = max(level, THREAT_LEVELS.index(rule_level))
+        return details, THREAT_LEVELS[level], total_ns
+
+    def report(self) -> dict:
+        """Return per-rule counters for this rule set."""
+        return {
+            "name": self.name,
+            "rules": {name: stats.to_dict() for name, stats in self.stats.items()},
+        }
+
+
+@dataclass
+class ShadowStats:
+    """Verdict comparison between the live and the shadow rule set."""
+    samples: int = 0
+    agreements: int = 0
+    live_ns: int = 0
+    shadow_ns: int = 0
+    recent_disagreements: deque = field(default_factory=lambda: deque(maxlen=20))
+
+    def to_dict(self) -> dict:
+        """Return the comparison in a JSON-serializable form."""
+        return {
+            "samples": self.samples,
+            "agreements": self.agreements,
+            "disagreements": self.samples - self.agreements,
+            "agreement_rate": self.agreements / self.samples if self.samples else 0.0,
+            "live_avg_us": self.live_ns / self.samples / 1e3 if self.samples else 0.0,
+            "shadow_avg_us": self.shadow_ns / self.samples / 1e3 if self.samples else 0.0,
+            "recent_disagreements": list(self.recent_disagreements),
+        }
+
+
+class RuleEngine:
+    """
+    Holds the live rule set and an optional shadow candidate.
+
+    The shadow rule set runs on a sample of traffic next to the live one.
+    Its verdicts never affect responses; they are only compared and counted.
+    """
+
+    def __init__(self, live: RuleSet, shadow: Optional[RuleSet] = None, sample_rate: float = 0.0):
+        self.live = live
+        self.shadow = shadow
+        self.sample_rate = sample_rate
+        self.shadow_stats = ShadowStats()
+
+    def evaluate(self, check_request: Any, settings: Any) -> Tuple[dict, str]:
+        """
+        Evaluate a check request with the live rule set, shadowing if sampled.
+
+        Returns:
+            Tuple of (threat details, threat level) from the live rule set
+        """
+        # Bind both rule sets once so a concurrent promotion cannot mix them
+        live, shadow = self.live, self.shadow
+        details, level, live_ns = live.evaluate(check_request, settings)
+
+        if shadow is not None and random.random() < self.sample_rate:
+            shadow_details, shadow_level, shadow_ns = shadow.evaluate(check_request, settings)
+            stats = self.shadow_stats
+            stats.samples += 1
+            stats.live_ns += live_ns
+            stats.shadow_ns += shadow_ns
+            if (bool(details), level) == (bool(shadow_details), shadow_level):
+                stats.agreements += 1
+            else:
+                stats.recent_disagreements.append({
+                    "path": check_request.path,
+                    "method": check_request.method,
+                    "live": {"is_threat": bool(details), "threat_level": level, "rules": list(details)},
+                    "shadow": {"is_threat": bool(shadow_details), "threat_level": shadow_level, "rules": list(shadow_details)},
+                })
+
+        return details, level
+
+    def set_shadow(self, shadow: Optional[RuleSet], sample_rate: float) -> None:
+        """Replace the shadow rule set and reset the comparison counters."""
+        self.shadow = shadow
+        self.sample_rate = sample_rate
+        self.shadow_stats = ShadowStats()
+
+    def promote(self) -> RuleSet:
+        """
+        Promote the shadow rule set to live.
+
+        The promoted set is renamed to live and its counters start from zero,
+        since the shadow counters only covered sampled traffic.
+
+        Returns:
+            The rule set that was live before promotion
+
+        Raises:
+            ValueError: If no shadow rule set is configured
+        """
+        if self.shadow is None:
+            raise ValueError("No shadow rule set to promote")
+        previous = self.live
+        self.live, self.shadow = RuleSet(name="live", rules=self.shadow.rules), None
+        self.shadow_stats = ShadowStats()
+        return previous
+
+    def report(self) -> dict:
+        """Return live and shadow counters."""
+        return {
+            "live": self.live.report(),
+            "shadow": {
+                **self.shadow.report(),
+                "sample_rate": self.sample_rate,
+                "comparison": self.shadow_stats.to_dict(),
+            } if self.shadow is not None else None,
+        }
+
+
+def build_rule_set(name: str, rule_names: Iterable[str], registry: Dict[str, Rule]) -> RuleSet:
+    """
+    Build a rule set from rule names.
+
+    Raises:
+        ValueError: If a rule name is not registered
+    """
+    unknown = [rule_name for rule_name in rule_names if rule_name not in registry]
+    if unknown:
+        raise ValueError(f"Unknown security rules: {', '.join(unknown)}")
+    return RuleSet(name=name, rules=[registry[rule_name] for rule_name in rule_names])
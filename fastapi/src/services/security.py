@@ -4,9 +4,105 @@ Security Service
 This module contains the business logic for security threat analysis.
 """
 
+from typing import List
 from fastapi import Request
 from src.schemas.security import SecurityCheckRequest, SecurityCheckResponse
 from src.core.config import get_settings
+from src.services.anomaly import get_anomaly_model
+from src.services.rules import THREAT_LEVELS, Rule, RuleEngine, build_rule_set
+
+def _check_body_size(check_request: SecurityCheckRequest, settings):
+    """Rule: flag bodies larger than MAX_BODY_SIZE bytes of compact JSON."""
+    body_size = check_request.measured_body_size()
+    if body_size > settings.MAX_BODY_SIZE:
+        return f"Body size {body_size} exceeds limit of {settings.MAX_BODY_SIZE}", "Medium"
+    return None
+
+# List of potentially dangerous headers
+DANGEROUS_HEADERS = [
+    "x-forwarded-for",
+    "x-real-ip",
+    "x-remote-addr",
+    "x-originating-ip",
+    "x-remote-ip"
+]
+
+SUSPICIOUS_PATH_PATTERNS = [
+    "../",
+    "..\\",
+    "exec",
+    "eval",
+    "system",
+    "/etc/",
+    "cmd",
+    "powershell"
+]
+
+def check_suspicious_headers(headers: dict) -> dict:
+    """Check for suspicious headers."""
+    suspicious = {}
+    
+    for header in DANGEROUS_HEADERS:
+        if header in headers.keys():
+            suspicious[header] = "Potentially dangerous header detected"
+            
+    return suspicious
+
+def is_suspicious_path(path: str) -> bool:
+    """Check if the path contains suspicious patterns."""
+    return any(pattern in path.lower() for pattern in SUSPICIOUS_PATH_PATTERNS)
+
+def _check_headers(check_request: SecurityCheckRequest, settings):
+    """Rule: flag potentially dangerous headers."""
+    suspicious_headers = check_suspicious_headers(check_request.headers)
+    if suspicious_headers:
+        return suspicious_headers, "High" if len(suspicious_headers) > 2 else "Medium"
+    return None
+
+def _check_path(check_request: SecurityCheckRequest, settings):
+    """Rule: flag suspicious path patterns."""
+    if is_suspicious_path(check_request.path):
+        return f"Suspicious path pattern detected: {check_request.path}", "High"
+    return None
+
+# Registry of rules that can be referenced by name from the configuration
+RULES = {
+    rule.name: rule
+    for rule in (
+        Rule("body_size", _check_body_size),
+        Rule("suspicious_headers", _check_headers),
+        Rule("suspicious_path", _check_path),
+    )
+}
+
+_rule_engine = None
+
+def load_rule_engine(rule_names: List[str], shadow_rule_names: List[str], sample_rate: float) -> RuleEngine:
+    """
+    Build the process-wide rule engine.
+
+    Called at startup so unknown rule names stop the application.
+
+    Raises:
+        ValueError: If a rule name is not registered
+    """
+    global _rule_engine
+    live = build_rule_set("live", rule_names, RULES)
+    shadow = build_rule_set("shadow", shadow_rule_names, RULES) if shadow_rule_names else None
+    _rule_engine = RuleEngine(live, shadow, sample_rate)
+    return _rule_engine
+
+def get_rule_engine() -> RuleEngine:
+    """
+    Get the process-wide rule engine, building it from settings if startup did not.
+
+    Returns:
+        RuleEngine: Engine holding the live and shadow rule sets
+    """
+    if _rule_engine is None:
+        settings = get_settings()
+        return load_rule_engine(settings.SECURITY_RULES, settings.SHADOW_RULES, settings.SHADOW_SAMPLE_RATE)
+    return _rule_engine
 
 class SecurityService:
     """Service for analyzing security threats in incoming requests."""
@@ -26,28 +122,46 @@ class SecurityService:
         Returns:
             Dictionary containing security analysis results
         """
+        return (await self.analyze_batch(request, [check_request]))[0]
+
+    async def analyze_batch(
+        self,
+        request: Request,
+        check_requests: List[SecurityCheckRequest]
+    ) -> List[dict]:
+        """
+        Analyze a batch of requests for potential security threats.
+
+        Rules run per check; the optional anomaly model scores the whole batch at once.
+
+        Args:
+            request: The FastAPI request object
+            check_requests: The security check request data
+
+        Returns:
+            List of security analysis results, in request order
+        """
         settings = get_settings()
-        threat_details = {}
-        threat_level = "Low"
-        
-        # Check body size
-        if check_request.body:
-            body_size = len(str(check_request.body))
-            if body_size > settings.MAX_BODY_SIZE:
-                threat_details["body_size"] = f"Body size {body_size} exceeds limit of {settings.MAX_BODY_SIZE}"
-                threat_level = "Medium"
-        
-        # Check for suspicious headers
-        suspicious_headers = self._check_suspicious_headers(check_request.headers)
-        if suspicious_headers:
-            threat_details["suspicious_headers"] = suspicious_headers
-            threat_level = "High" if len(suspicious_headers) > 2 else "Medium"
-        
-        # Check for suspicious paths
-        if self._is_suspicious_path(check_request.path):
-            threat_details["suspicious_path"] = f"Suspicious path pattern detected: {check_request.path}"
-            threat_level = "High"
-        
+        engine = get_rule_engine()
+        evaluated = [engine.evaluate(check_request, settings) for check_request in check_requests]
+
+        results = [self._build_result(threat_details, threat_level) for threat_details, threat_level in evaluated]
+
+        model = get_anomaly_model()
+        if model is not None:
+            for result, (scored, anomaly) in zip(results, model.verdicts(check_requests)):
+                # Lets callers tell "not anomalous" from "not scored within the budget"
+                result["anomaly_scored"] = scored
+                if anomaly is not None:
+                    threat_details = result["details"]
+                    threat_details["anomaly_score"] = anomaly
+                    threat_level = max(result["threat_level"], "Medium", key=THREAT_LEVELS.index)
+                    result.update(self._build_result(threat_details, threat_level))
+
+        return results
+
+    def _build_result(self, threat_details: dict, threat_level: str) -> dict:
+        """Build the analysis result for one request."""
         is_threat = bool(threat_details)
         
         return {
@@ -57,40 +171,6 @@ class SecurityService:
             "recommendations": self._get_recommendations(threat_details) if is_threat else {}
         }
     
-    def _check_suspicious_headers(self, headers: dict) -> dict:
-        """Check for suspicious headers."""
-        suspicious = {}
-        
-        # List of potentially dangerous headers
-        dangerous_headers = [
-            "x-forwarded-for",
-            "x-real-ip",
-            "x-remote-addr",
-            "x-originating-ip",
-            "x-remote-ip"
-        ]
-        
-        for header in dangerous_headers:
-            if header in headers.keys():
-                suspicious[header] = "Potentially dangerous header detected"
-                
-        return suspicious
-    
-    def _is_suspicious_path(self, path: str) -> bool:
-        """Check if the path contains suspicious patterns."""
-        suspicious_patterns = [
-            "../",
-            "..\\",
-            "exec",
-            "eval",
-            "system",
-            "/etc/",
-            "cmd",
-            "powershell"
-        ]
-        
-        return any(pattern in path.lower() for pattern in suspicious_patterns)
-    
     def _get_recommendations(self, threat_details: dict) -> dict:
         """Generate security recommendations based on threats."""
         recommendations = {}
@@ -103,5 +183,8 @@ class SecurityService:
             
         if "suspicious_path" in threat_details:
             recommendations["path"] = "Implement strict path validation and consider using a web application firewall"
+
+        if "anomaly_score" in threat_details:
+            recommendations["anomaly"] = "Request shape deviates from normal traffic, review it and consider adding a targeted rule"
             
         return recommendations
@@ -0,0 +1,25 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.v1.security.router import router as security_router
+
+@pytest.fixture
+def api_key():
+    """API key the test apps accept from Express."""
+    return "test-key"
+
+
+@pytest.fixture
+def security_app(monkeypatch, api_key):
+    """App with only the security router, accepting api_key."""
+    monkeypatch.setenv("EXPRESS_API_KEY", api_key)
+    app = FastAPI()
+    app.include_router(security_router, prefix="/api/v1")
+    return app
+
+
+@pytest.fixture
+def security_client(security_app, api_key):
+    """Test client for security_app that sends api_key."""
+    return TestClient(security_app, headers={"X-API-Key": api_key})
@@ -0,0 +1,84 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+from src.schemas.security import MAX_BATCH_CHECKS, SecurityCheckRequest
+from src.services.anomaly import FEATURES, AnomalyModel, extract_features, load_anomaly_model
+
+
+def make_check(path, headers=None, body=None):
+    return SecurityCheckRequest(method="POST", path=path, headers=headers or {}, body=body)
+
+
+def test_extract_features():
+    features = extract_features([
+        make_check("/api/users", {"User-Agent": "x", "Accept": "*/*"}, {"a": 1, "b": 2}),
+        make_check("aaaa"),
+    ])
+    row = dict(zip(FEATURES, features[0]))
+    assert features.shape == (2, len(FEATURES))
+    assert row["path_length"] == 10 and row["path_depth"] == 2
+    assert row["header_count"] == 2 and row["has_user-agent"] == 1 and row["has_cookie"] == 0
+    assert row["body_key_count"] == 2
+    # A path made of a single character class has zero entropy
+    assert features[1, FEATURES.index("path_entropy")] == 0
+
+
+def test_model_file_is_validated(tmp_path):
+    model_file = tmp_path / "model.json"
+    model_file.write_text(json.dumps({"weights": [0.0] * len(FEATURES), "bias": 0.0, "threshold": 0.7}))
+    assert AnomalyModel.load(str(model_file)).threshold == 0.7
+
+    model_file.write_text(json.dumps({"weights": [0.0], "bias": 0.0}))
+    with pytest.raises(ValueError):
+        AnomalyModel.load(str(model_file))
+
+
+def test_exhausted_budget_leaves_checks_unscored():
+    model = AnomalyModel(weights=np.zeros(len(FEATURES)), bias=0.0, max_batch=2, budget_ms=0)
+    scores = model.score_batch([make_check("/a")] * 5)
+    assert scores[0] == 0.5 and all(math.isnan(score) for score in scores[2:])
+    assert model.stats.skipped == 3
+    assert [scored for scored, _ in model.verdicts([make_check("/a")] * 5)] == [True, True, False, False, False]
+
+
+def test_invalid_batch_settings_are_rejected():
+    with pytest.raises(ValueError):
+        AnomalyModel(weights=np.zeros(len(FEATURES)), bias=0.0, max_batch=0)
+
+
+def test_default_chunks_let_the_budget_cut_a_full_batch():
+    model = AnomalyModel(weights=np.zeros(len(FEATURES)), bias=0.0, budget_ms=0)
+    assert model.max_batch < MAX_BATCH_CHECKS
+    scored = [scored for scored, _ in model.verdicts([make_check("/a")] * MAX_BATCH_CHECKS)]
+    assert scored.count(True) == model.max_batch
+
+
+def test_batch_endpoint_adds_anomaly_verdicts(tmp_path, security_client):
+    weights = [0.0] * len(FEATURES)
+    weights[FEATURES.index("path_length")] = 1.0
+    model_file = tmp_path / "model.json"
+    model_file.write_text(json.dumps({"weights": weights, "bias": -50.0, "threshold": 0.5}))
+    load_anomaly_model(str(model_file))
+
+    try:
+        checks = [
+            {"method": "GET", "path": "/api/users", "headers": {}},
+            {"method": "GET", "path": "/api/" + "a" * 100, "headers": {}},
+        ]
+        results = security_client.post("/api/v1/security/check/batch", json={"checks": checks}).json()["results"]
+        assert results[0]["is_threat"] is False
+        assert results[1]["threat_level"] == "Medium"
+        assert "anomaly_score" in results[1]["details"]
+        assert all(result["anomaly_scored"] for result in results)
+        assert security_client.get("/api/v1/security/rules/metrics").json()["anomaly"]["checks"] == 2
+    finally:
+        load_anomaly_model(None)
+
+
+def test_batch_size_is_limited(security_client):
+    checks = [{"method": "GET", "path": "/", "headers": {}}] * (MAX_BATCH_CHECKS + 1)
+    response = security_client.post("/api/v1/security/check/batch", json={"checks": checks})
+    assert response.status_code == 422
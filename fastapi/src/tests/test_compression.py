@@ -0,0 +1,97 @@
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.middleware.cache import StaticResponseCacheMiddleware
+from src.middleware.compression import CompressionMiddleware, negotiate_encoding
+
+PAYLOAD = {"results": [{"is_threat": False, "threat_level": "Low", "details": {}}] * 100}
+
+
+def make_client():
+    app = FastAPI()
+    calls = []
+
+    @app.get("/large")
+    async def large():
+        return PAYLOAD
+
+    @app.get("/small")
+    async def small():
+        return {"status": "ok"}
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse((b"chunk" * 200 for _ in range(10)), media_type="text/plain")
+
+    @app.get("/health")
+    async def health():
+        calls.append(1)
+        return {"status": "healthy", "service": "fastapi"}
+
+    app.add_middleware(StaticResponseCacheMiddleware, paths=["/health"])
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    return TestClient(app), calls
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5") == "gzip"
+    assert negotiate_encoding("br;q=0, gzip;q=0") is None
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("") is None
+
+
+def test_responses_are_compressed_above_threshold():
+    client, _ = make_client()
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == PAYLOAD
+
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+    response = client.get("/stream", headers={"Accept-Encoding": "br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.text == "chunk" * 2000
+
+
+def test_static_endpoints_use_precomputed_bodies_and_etags():
+    client, calls = make_client()
+    first = client.get("/health", headers={"Accept-Encoding": "identity"})
+    etag = first.headers["etag"]
+    assert first.json() == {"status": "healthy", "service": "fastapi"}
+
+    second = client.get("/health", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert second.status_code == 304 and second.content == b""
+
+    for encoding in ("br", "gzip"):
+        response = client.get("/health", headers={"Accept-Encoding": encoding})
+        assert response.headers["content-encoding"] == encoding
+        assert response.headers["etag"] != etag
+        assert response.json() == {"status": "healthy", "service": "fastapi"}
+    assert len(calls) == 1
+
+
+def test_etag_of_another_variant_does_not_validate():
+    client, _ = make_client()
+    gzip_etag = client.get("/health", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+
+    response = client.get("/health", headers={"Accept-Encoding": "identity", "If-None-Match": gzip_etag})
+    assert response.status_code == 200
+    assert response.json() == {"status": "healthy", "service": "fastapi"}
+
+    response = client.get("/health", headers={"Accept-Encoding": "gzip", "If-None-Match": f"W/{gzip_etag}"})
+    assert response.status_code == 304 and response.headers["etag"] == gzip_etag
+
+
+def test_head_behaves_the_same_before_and_after_the_cache_is_primed():
+    client, calls = make_client()
+    head = client.head("/health", headers={"Accept-Encoding": "identity"})
+    assert head.status_code == 200 and head.content == b""
+    assert int(head.headers["content-length"]) == len(b'{"status":"healthy","service":"fastapi"}')
+
+    get = client.get("/health", headers={"Accept-Encoding": "identity"})
+    assert get.headers["etag"] == head.headers["etag"]
+    assert client.head("/health", headers={"Accept-Encoding": "identity"}).content == b""
+    assert len(calls) == 1
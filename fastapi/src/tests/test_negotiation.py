@@ -0,0 +1,86 @@
+import json
+
+import msgpack
+
+from benchmarks.wire_format import trim
+from src.core.negotiation import MSGPACK_MEDIA_TYPE
+from src.schemas.security import SecurityCheckRequest
+
+CHECK = {"method": "GET", "path": "/etc/passwd", "headers": {"host": "example.com"}, "body": None}
+
+
+def test_json_remains_default(security_client):
+    response = security_client.post("/api/v1/security/check", json=CHECK)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["threat_level"] == "High"
+
+
+def test_msgpack_request_and_response(security_client):
+    response = security_client.post(
+        "/api/v1/security/check",
+        content=msgpack.packb(CHECK),
+        headers={"Content-Type": MSGPACK_MEDIA_TYPE, "Accept": MSGPACK_MEDIA_TYPE},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MSGPACK_MEDIA_TYPE
+    assert msgpack.unpackb(response.content)["threat_level"] == "High"
+
+
+def test_trimmed_body_uses_body_size(security_client):
+    trimmed = {**CHECK, "path": "/api/users", "body_size": 10**9, "body_digest": "abc"}
+    response = security_client.post("/api/v1/security/check", content=json.dumps(trimmed))
+    assert "body_size" in response.json()["details"]
+
+
+def test_invalid_bodies_are_rejected(security_client):
+    response = security_client.post(
+        "/api/v1/security/check", content=b"\xc1", headers={"Content-Type": MSGPACK_MEDIA_TYPE}
+    )
+    assert response.status_code == 400
+    response = security_client.post("/api/v1/security/check", json={"path": "/"})
+    assert response.status_code == 422
+    assert ["body", "headers"] in [error["loc"] for error in response.json()["detail"]]
+    response = security_client.post(
+        "/api/v1/security/check",
+        content=msgpack.packb({**CHECK, "body": {"a": msgpack.ExtType(5, b"x")}}),
+        headers={"Content-Type": MSGPACK_MEDIA_TYPE},
+    )
+    assert response.status_code == 400
+
+
+def test_accept_q_values_are_respected(security_client):
+    for accept, media_type in [
+        ("application/msgpack;q=0, application/json", "application/json"),
+        ("application/json;q=0.5, application/msgpack", MSGPACK_MEDIA_TYPE),
+        ("application/msgpack, application/json", "application/json"),
+        ("*/*", "application/json"),
+    ]:
+        response = security_client.post("/api/v1/security/check", json=CHECK, headers={"Accept": accept})
+        assert response.headers["content-type"] == media_type
+
+
+def test_full_and_trimmed_bodies_have_the_same_size():
+    body = {"name": "Zoë", "items": [1, 2, 3], "note": None}
+    full = SecurityCheckRequest(**{**CHECK, "body": body})
+    trimmed = SecurityCheckRequest(**trim({**CHECK, "body": body}))
+    assert full.measured_body_size() == trimmed.measured_body_size()
+
+
+def test_binary_msgpack_bodies_are_measured_as_base64(security_client):
+    check = {**CHECK, "path": "/api/upload", "body": {"file": b"\x00" * 90}}
+    response = security_client.post(
+        "/api/v1/security/check",
+        content=msgpack.packb(check, use_bin_type=True),
+        headers={"Content-Type": MSGPACK_MEDIA_TYPE},
+    )
+    assert response.status_code == 200
+    # 90 bytes become 120 base64 characters, over MAX_BODY_SIZE (100)
+    assert "body_size" in response.json()["details"]
+
+    response = security_client.post(
+        "/api/v1/security/check/batch",
+        content=msgpack.packb({"checks": [check]}, use_bin_type=True),
+        headers={"Content-Type": MSGPACK_MEDIA_TYPE},
+    )
+    assert response.status_code == 200
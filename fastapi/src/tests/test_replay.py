@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import json
+from dataclasses import replace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from benchmarks.replay import (
+    CapturedRequest,
+    _load_app,
+    _parse_header,
+    _parse_rate,
+    diff_results,
+    load_corpus,
+    load_log_records,
+    open_client,
+    replay,
+    save_corpus,
+    summarize,
+)
+
+LOG_LINES = [
+    "2024-12-20 13:12:07,000 - INFO - console output is skipped",
+    json.dumps({
+        "asctime": "2024-12-20 13:12:07,500", "type": "request_started", "method": "POST",
+        "path": "/api/v1/security/check", "query_params": {},
+        "headers": {"host": "fastapi:8000", "content-type": "application/json", "x-api-key": "[REDACTED]"},
+        "body": {"method": "GET", "path": "/etc/passwd", "headers": {}},
+    }),
+    json.dumps({"asctime": "2024-12-20 13:12:07,600", "type": "request_completed", "status_code": 200}),
+    json.dumps({
+        "asctime": "2024-12-20 13:12:07,250", "type": "request_started", "method": "POST",
+        "path": "/api/v1/security/check", "query_params": {},
+        "headers": {"content-type": "application/json", "x-api-key": "[REDACTED]"},
+        "body": {"method": "GET", "path": "/api/users", "headers": {}},
+    }),
+]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    log_file = tmp_path / "app.log"
+    log_file.write_text("\n".join(LOG_LINES) + "\n")
+    capture_file = tmp_path / "corpus.jsonl"
+    save_corpus(load_log_records([str(log_file)]), str(capture_file))
+    return load_corpus(str(capture_file))
+
+
+def test_capture_keeps_request_started_records_in_time_order(corpus):
+    assert [captured.body["path"] for captured in corpus] == ["/api/users", "/etc/passwd"]
+    assert [captured.offset for captured in corpus] == pytest.approx([0.0, 0.25])
+
+
+def test_replay_in_process_reports_verdicts(corpus, security_app, api_key):
+
+    async def run():
+        transport = httpx.ASGITransport(app=security_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://replay") as client:
+            return await replay(corpus, client, speed=None, header_overrides={"X-API-Key": api_key})
+
+    results = asyncio.run(run())
+    assert [result.verdict["threat_level"] for result in results] == ["Low", "High"]
+    assert summarize(results, 1.0)["statuses"] == {"200": 2}
+
+    changed = [results[0], replace(results[1], verdict=None)]
+    assert diff_results(results, changed)["differences"] == 1
+
+
+def test_batch_and_msgpack_responses_report_verdicts(security_app, api_key):
+    checks = [{"method": "GET", "path": path, "headers": {}} for path in ("/api/users", "/etc/passwd")]
+    corpus = [
+        CapturedRequest(offset=0.0, method="POST", path="/api/v1/security/check/batch", body={"checks": checks}),
+        CapturedRequest(offset=0.0, method="POST", path="/api/v1/security/check", body=checks[1],
+                        headers={"accept": "application/msgpack"}),
+    ]
+
+    async def run():
+        transport = httpx.ASGITransport(app=security_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://replay") as client:
+            return await replay(corpus, client, speed=None, header_overrides={"X-API-Key": api_key})
+
+    batch, single = asyncio.run(run())
+    assert [verdict["threat_level"] for verdict in batch.verdict["results"]] == ["Low", "High"]
+    assert single.verdict == {"is_threat": True, "threat_level": "High"}
+
+    changed = replace(batch, verdict={"results": [batch.verdict["results"][0], None]})
+    assert diff_results([batch], [changed])["differences"] == 1
+
+
+lifespan_app = FastAPI()
+lifespan_app.state.started = False
+
+
+@lifespan_app.on_event("startup")
+async def mark_started():
+    lifespan_app.state.started = True
+
+
+@lifespan_app.get("/started")
+async def started():
+    await asyncio.sleep(0.05)
+    return {"started": lifespan_app.state.started}
+
+
+def test_in_process_replay_runs_lifespan_and_counts_queue_wait():
+    corpus = [CapturedRequest(offset=0.0, method="GET", path="/started") for _ in range(2)]
+
+    async def run():
+        async with open_client("src.tests.test_replay:lifespan_app") as client:
+            return await replay(corpus, client, speed=1.0, concurrency=1)
+
+    first, second = asyncio.run(run())
+    # The target is imported by name, which may be a different module object than this one
+    assert first.status_code == 200 and _load_app("src.tests.test_replay:lifespan_app").state.started
+    # The second request waits for the only slot; that wait counts as latency
+    assert second.queue_ms >= 40 and second.latency_ms >= first.latency_ms + 40
+
+
+def test_cli_arguments_are_validated():
+    assert _parse_header("X-API-Key: k") == ("X-API-Key", "k")
+    with pytest.raises(argparse.ArgumentTypeError):
+        _parse_header("X-API-Key")
+    assert _parse_rate("max") is None and _parse_rate("2.5") == 2.5
+    for rate in ("0", "-1", "fast"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            _parse_rate(rate)
@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.schemas.security import SecurityCheckRequest
+from src.services.rules import RuleEngine, build_rule_set
+from src.services import security
+from src.services.security import RULES
+
+settings = SimpleNamespace(MAX_BODY_SIZE=100)
+
+
+def make_request(path="/api/users", headers=None, body=None):
+    return SecurityCheckRequest(method="GET", path=path, headers=headers or {}, body=body)
+
+
+def test_live_rule_set_records_calls_and_hits():
+    live = build_rule_set("live", ["body_size", "suspicious_headers", "suspicious_path"], RULES)
+    engine = RuleEngine(live)
+
+    details, level = engine.evaluate(make_request(), settings)
+    assert details == {} and level == "Low"
+
+    details, level = engine.evaluate(make_request(path="/etc/passwd", headers={"x-real-ip": "1.2.3.4"}), settings)
+    assert set(details) == {"suspicious_headers", "suspicious_path"}
+    assert level == "High"
+
+    rules = engine.report()["live"]["rules"]
+    assert rules["suspicious_path"]["calls"] == 2
+    assert rules["suspicious_path"]["hits"] == 1
+    assert rules["body_size"]["hits"] == 0
+
+
+def test_shadow_rule_set_compares_verdicts_and_promotes():
+    live = build_rule_set("live", ["suspicious_headers"], RULES)
+    shadow = build_rule_set("shadow", ["suspicious_headers", "suspicious_path"], RULES)
+    engine = RuleEngine(live, shadow, sample_rate=1.0)
+
+    engine.evaluate(make_request(), settings)
+    details, level = engine.evaluate(make_request(path="/cmd"), settings)
+    assert details == {} and level == "Low"
+
+    comparison = engine.report()["shadow"]["comparison"]
+    assert comparison["samples"] == 2
+    assert comparison["disagreements"] == 1
+    assert comparison["recent_disagreements"][0]["shadow"]["rules"] == ["suspicious_path"]
+
+    assert engine.promote() is live
+    assert engine.live.rules == shadow.rules and engine.shadow is None
+    live_report = engine.report()["live"]
+    assert live_report["name"] == "live"
+    assert all(rule["calls"] == 0 for rule in live_report["rules"].values())
+    with pytest.raises(ValueError):
+        engine.promote()
+
+
+def test_unknown_rule_name_is_rejected(monkeypatch):
+    with pytest.raises(ValueError):
+        build_rule_set("live", ["no_such_rule"], RULES)
+
+    monkeypatch.setattr(security, "_rule_engine", None)
+    with pytest.raises(ValueError):
+        security.load_rule_engine(["body_size"], ["no_such_rule"], 0.1)
+
+
+def test_shadow_rule_set_can_be_replaced_through_the_endpoint(monkeypatch, security_client):
+    monkeypatch.setattr(security, "_rule_engine", None)
+
+    response = security_client.put("/api/v1/security/rules/shadow", json={"rules": ["suspicious_path"], "sample_rate": 1.0})
+    assert response.status_code == 200
+    assert list(response.json()["rules"]) == ["suspicious_path"]
+    assert security_client.put("/api/v1/security/rules/shadow", json={"rules": ["no_such_rule"]}).status_code == 400
+
+    response = security_client.post("/api/v1/security/rules/promote")
+    assert response.json()["promoted"] == ["suspicious_path"]